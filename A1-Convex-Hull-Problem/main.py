@@ -1,15 +1,18 @@
 # Convex hull
 #
-# Usage: python main.py [-d] file_of_points
+# Usage: python main.py [-d] [--debug] file_of_points
+#
+# With --debug, the hulls are shown and the program pauses after every
+# merge (press 'p' to proceed).
 #
 # You can press ESC in the window to exit.
 #
 # You'll need Python 3 and must install these packages:
 #
-#   PyOpenGL, GLFW
+#   PyOpenGL, GLFW, NumPy, Numba
 
 
-import sys, os, math
+import sys, os
 
 try:  # PyOpenGL
     from OpenGL.GL import *
@@ -23,6 +26,18 @@ except:
     print('Error: GLFW has not been installed.')
     sys.exit(1)
 
+try:  # NumPy
+    import numpy as np
+except:
+    print('Error: NumPy has not been installed.')
+    sys.exit(1)
+
+try:  # Numba
+    from numba import njit, prange
+except:
+    print('Error: Numba has not been installed.')
+    sys.exit(1)
+
 # Globals
 
 window = None
@@ -40,71 +55,109 @@ r = 0.01  # point radius as fraction of window size
 numAngles = 32
 thetas = [i / float(numAngles) * 2 * 3.14159 for i in range(numAngles)]  # used for circle drawing
 
-allPoints = []  # list of points
+cosThetas = np.cos(thetas)  # unit circle, computed once
+sinThetas = np.sin(thetas)
+
+# Points
+#
+# The points are stored as parallel arrays, indexed by the position of
+# each point after sorting.  The 'ccw' and 'cw' arrays hold the index
+# of the point beside it (CCW and CW) on its hull, or -1 if the point
+# is not on any hull.
+#
+# For debugging, you can set the 'highlight' flag of a point.  This
+# will cause the point to be highlighted when it's drawn.
+
+xs = None  # point coordinates
+ys = None
+
+ccw = None  # point CCW of this on hull
+cw = None  # point CW of this on hull
+
+highlight = None  # to cause drawing to highlight this point
+
+circleVerts = None  # vertices of the circles drawn around the points
+circleFirsts = None  # index of first vertex of each circle
+circleCounts = None  # number of vertices of each circle
+
+smallRunSize = 16  # runs of fewer than 2*smallRunSize points get their hull built directly
 
 lastKey = None  # last key pressed
 
 discardPoints = False
 
+debugMode = False  # show and pause after every merge
 
-# Point
-#
-# A Point stores its coordinates and pointers to the two points beside
-# it (CW and CCW) on its hull.  The CW and CCW pointers are None if
-# the point is not on any hull.
+
+# Build the circles of all points in one vertex array, so that each
+# kind of circle is drawn with a single glMultiDrawArrays() call.
 #
-# For debugging, you can set the 'highlight' flag of a point.  This
-# will cause the point to be highlighted when it's drawn.
+# The points don't move, so this is done once, after the points are
+# read and the radius is set.
+
+def buildCircles():
+    global circleVerts, circleFirsts, circleCounts
+
+    n = len(xs)
 
-class Point(object):
+    circleVerts = np.empty((n, numAngles, 2), dtype=np.float32)
+    circleVerts[:, :, 0] = xs[:, np.newaxis] + r * cosThetas
+    circleVerts[:, :, 1] = ys[:, np.newaxis] + r * sinThetas
 
-    def __init__(self, coords):
+    circleFirsts = np.arange(0, n * numAngles, numAngles, dtype=np.int32)
+    circleCounts = np.full(n, numAngles, dtype=np.int32)
 
-        self.x = float(coords[0])  # coordinates
-        self.y = float(coords[1])
 
-        self.ccwPoint = None  # point CCW of this on hull
-        self.cwPoint = None  # point CW of this on hull
+# Draw all points and the edges to their neighbours on the hull
 
-        self.highlight = False  # to cause drawing to highlight this point
+def drawPoints():
+    n = len(xs)
 
-    def __repr__(self):
-        return 'pt(%g,%g)' % (self.x, self.y)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(2, GL_FLOAT, 0, circleVerts)
 
-    def drawPoint(self):
+    # Highlight with yellow fill
 
-        # Highlight with yellow fill
+    highlighted = np.flatnonzero(highlight)
 
-        if self.highlight:
-            glColor3f(0.9, 0.9, 0.4)
-            glBegin(GL_POLYGON)
-            for theta in thetas:
-                glVertex2f(self.x + r * math.cos(theta), self.y + r * math.sin(theta))
-            glEnd()
+    if len(highlighted) > 0:
+        glColor3f(0.9, 0.9, 0.4)
+        glMultiDrawArrays(GL_POLYGON, circleFirsts[highlighted], circleCounts[highlighted], len(highlighted))
 
-        # Outline the point
+    # Outline the points
 
-        glColor3f(0, 0, 0)
-        glBegin(GL_LINE_LOOP)
-        for theta in thetas:
-            glVertex2f(self.x + r * math.cos(theta), self.y + r * math.sin(theta))
-        glEnd()
+    glColor3f(0, 0, 0)
+    glMultiDrawArrays(GL_LINE_LOOP, circleFirsts, circleCounts, n)
 
-        # Draw edges to next CCW and CW points.
+    glDisableClientState(GL_VERTEX_ARRAY)
 
-        if self.ccwPoint:
-            glColor3f(0, 0, 1)
-            drawArrow(self.x, self.y, self.ccwPoint.x, self.ccwPoint.y)
+    # Draw edges to next CCW and CW points.
 
-        if self.cwPoint:
-            glColor3f(1, 0, 0)
-            drawArrow(self.x, self.y, self.cwPoint.x, self.cwPoint.y)
+    onHull = np.flatnonzero(ccw != -1)
+    glColor3f(0, 0, 1)
+    drawArrows(onHull, ccw[onHull])
 
+    onHull = np.flatnonzero(cw != -1)
+    glColor3f(1, 0, 0)
+    drawArrows(onHull, cw[onHull])
 
-# Draw an arrow between two points, offset a bit to the right
 
-def drawArrow(x0, y0, x1, y1):
-    d = math.sqrt((x1 - x0) * (x1 - x0) + (y1 - y0) * (y1 - y0))
+# Draw arrows from points 'src' to points 'dst' (arrays of indices),
+# offset a bit to the right
+#
+# The geometry of all arrows is computed at once, then the shafts are
+# drawn with one glDrawArrays() call and the heads with another.
+
+def drawArrows(src, dst):
+    if len(src) == 0:
+        return
+
+    x0 = xs[src]
+    y0 = ys[src]
+    x1 = xs[dst]
+    y1 = ys[dst]
+
+    d = np.hypot(x1 - x0, y1 - y0)
 
     vx = (x1 - x0) / d  # unit direction (x0,y0) -> (x1,y1)
     vy = (y1 - y0) / d
@@ -124,27 +177,42 @@ def drawArrow(x0, y0, x1, y1):
     xd = xb - 2 * r * vx - 0.5 * r * vpx  # arrow outside right
     yd = yb - 2 * r * vy - 0.5 * r * vpy
 
-    glBegin(GL_LINES)
-    glVertex2f(xa, ya)
-    glVertex2f(xb, yb)
-    glEnd()
+    shafts = np.stack([xa, ya, xb, yb], axis=1).astype(np.float32)
+    heads = np.stack([xb, yb, xc, yc, xd, yd], axis=1).astype(np.float32)
+
+    glEnableClientState(GL_VERTEX_ARRAY)
+
+    glVertexPointer(2, GL_FLOAT, 0, shafts)
+    glDrawArrays(GL_LINES, 0, 2 * len(src))
+
+    glVertexPointer(2, GL_FLOAT, 0, heads)
+    glDrawArrays(GL_TRIANGLES, 0, 3 * len(src))
 
-    glBegin(GL_POLYGON)
-    glVertex2f(xb, yb)
-    glVertex2f(xc, yc)
-    glVertex2f(xd, yd)
-    glEnd()
+    glDisableClientState(GL_VERTEX_ARRAY)
 
 
 # Determine whether three points make a left or right turn
+#
+# The points are given by their indices into 'xs' and 'ys'.  Arrays of
+# indices can also be given, in which case the turns of all the
+# triples are computed at once.
 
 LEFT_TURN = 1
-RIGHT_TURN = 2
-COLLINEAR = 3
+RIGHT_TURN = -1
+COLLINEAR = 0
 
 
 def turn(a, b, c):
-    det = (a.x - c.x) * (b.y - c.y) - (b.x - c.x) * (a.y - c.y)
+    det = (xs[a] - xs[c]) * (ys[b] - ys[c]) - (xs[b] - xs[c]) * (ys[a] - ys[c])
+
+    return np.sign(det)
+
+
+# Same as turn(), but compiled for use inside the hull merge
+
+@njit(cache=True, inline='always')
+def _turn(xs, ys, a, b, c):
+    det = (xs[a] - xs[c]) * (ys[b] - ys[c]) - (xs[b] - xs[c]) * (ys[a] - ys[c])
 
     if det > 0:
         return LEFT_TURN
@@ -154,140 +222,306 @@ def turn(a, b, c):
         return COLLINEAR
 
 
+# Merge two neighbouring hulls
+#
+# The left hull ends at point mid-1 and the right hull starts at point
+# mid, and the two must not share an x value: xs[mid-1] < xs[mid].  The
+# 'ccw' and 'cw' arrays are updated in place, and points removed from
+# the hull get -1 in both.
+#
+# Points mid-1 and mid are the largest and smallest points of their
+# hulls in (x, y) order, so both are on their hulls, and every walk
+# stays on them.  The asserts below only guard against a broken hull
+# being passed in.  Inside a parallel pass, one that fails shows up as
+# a SystemError without a useful message.
+#
+# 'stepped' is scratch space for the points stepped over.  Each point
+# is stepped over at most once per walk, so it needs room for twice
+# the number of points in the two hulls.
+#
+# This is compiled with Numba, so it only uses plain arrays and ints.
+# It is compiled ahead of its first call for the exact array types
+# used here (contiguous int32 and float64 arrays), and releases
+# the GIL while it runs.
+
+@njit('void(int32[::1], int32[::1], float64[::1], float64[::1], int32[::1], int64)',
+      cache=True, nogil=True)
+def _merge(ccw, cw, xs, ys, stepped, mid):
+    # Keep track of points stepped over during walk up/down.
+    numStepped = 0
+
+    # Walk up
+    left_node = mid - 1
+    right_node = mid
+
+    # Step up the left or right point while either can step up.  Each
+    # turn is tested once per step, and the right point is only tested
+    # if the left one can't step.
+    #
+    # A point is also stepped over if it lies on the line between its
+    # neighbour and the other point, so that collinear points are left
+    # off the hull, as in _runHull().  Since xs[left_node] < xs[right_node],
+    # the point is between the two exactly when its neighbour lies
+    # further out in x, which also keeps a walk from stepping back and
+    # forth along a line.
+    while True:
+        t = _turn(xs, ys, ccw[left_node], left_node, right_node)
+        if t == LEFT_TURN or (t == COLLINEAR and xs[ccw[left_node]] < xs[left_node]):
+            stepped[numStepped] = left_node
+            numStepped += 1
+            assert ccw[left_node] != -1
+            left_node = ccw[left_node]
+            continue
+
+        t = _turn(xs, ys, left_node, right_node, cw[right_node])
+        if t == LEFT_TURN or (t == COLLINEAR and xs[cw[right_node]] > xs[right_node]):
+            stepped[numStepped] = right_node
+            numStepped += 1
+            assert cw[right_node] != -1
+            right_node = cw[right_node]
+        else:
+            break
+
+    # Save references to points for top segment, to prevent modifying original
+    # `l` and `r` points before walk down algorithm occurs.
+    topleft = left_node
+    topright = right_node
+
+    # Walk down
+    left_node = mid - 1
+    right_node = mid
+
+    # Step down the left or right point while either can step down,
+    # also stepping over collinear points as above
+    while True:
+        t = _turn(xs, ys, cw[left_node], left_node, right_node)
+        if t == RIGHT_TURN or (t == COLLINEAR and xs[cw[left_node]] < xs[left_node]):
+            stepped[numStepped] = left_node
+            numStepped += 1
+            assert cw[left_node] != -1
+            left_node = cw[left_node]
+            continue
+
+        t = _turn(xs, ys, left_node, right_node, ccw[right_node])
+        if t == RIGHT_TURN or (t == COLLINEAR and xs[ccw[right_node]] > xs[right_node]):
+            stepped[numStepped] = right_node
+            numStepped += 1
+            assert ccw[right_node] != -1
+            right_node = ccw[right_node]
+        else:
+            break
+
+    bottom_right = right_node
+    bottom_left = left_node
+
+    cw[topleft] = topright
+    ccw[topright] = topleft
+    ccw[bottom_left] = bottom_right
+    cw[bottom_right] = bottom_left
+
+    # Discard the stepped-over points, except for the four on the new
+    # top and bottom segments.  A point stepped over twice is just
+    # discarded twice.
+
+    for k in range(numStepped):
+        point = stepped[k]
+        if point == topleft or point == topright or point == bottom_left or point == bottom_right:
+            continue
+        cw[point] = -1
+        ccw[point] = -1
+
+
+# Build the hull of a run of points lo to hi-1 directly
+#
+# This is Andrew's monotone chain: the lower hull is built left to
+# right and the upper hull right to left, popping points that don't
+# make a left turn, so collinear points are left off the hull.
+# _merge() follows the same rule, so no hull has a point in the middle
+# of an edge, wherever the run bounds fall.
+# 'stack' is scratch space for at least 2*(hi-lo) points.
+#
+# A run of a single point is its own hull, with both neighbours
+# pointing back to the point itself.
+
+@njit('void(int32[::1], int32[::1], float64[::1], float64[::1], int32[::1], int64, int64)',
+      cache=True, nogil=True)
+def _runHull(ccw, cw, xs, ys, stack, lo, hi):
+    if hi - lo == 1:
+        ccw[lo] = lo
+        cw[lo] = lo
+        return
+
+    k = 0
+
+    # Lower hull
+
+    for i in range(lo, hi):
+        while k >= 2 and _turn(xs, ys, stack[k - 2], stack[k - 1], i) != LEFT_TURN:
+            k -= 1
+        stack[k] = i
+        k += 1
+
+    # Upper hull, which ends back at point lo
+
+    lowerSize = k
+    for i in range(hi - 2, lo - 1, -1):
+        while k > lowerSize and _turn(xs, ys, stack[k - 2], stack[k - 1], i) != LEFT_TURN:
+            k -= 1
+        stack[k] = i
+        k += 1
+
+    # Link the points in CCW order
+
+    for j in range(k - 1):
+        ccw[stack[j]] = stack[j + 1]
+        cw[stack[j + 1]] = stack[j]
+
+
+# Build the hulls of all runs, and do one pass of merges
+#
+# Run k covers points bounds[k] to bounds[k+1]-1.  In a pass where each
+# hull is made of 'step' runs, hull j covers points bounds[j*step] up
+# to bounds[min((j+1)*step, numRuns)]-1.  Each run or merge is handled
+# in parallel with its own part of the 'stepped' scratch space, since
+# it only touches the points in its own range.
+#
+# _mergeBounds() gives the lo, mid and hi points of merge k of a pass,
+# which joins hulls 2k and 2k+1.  Both _mergePass() and the one at a
+# time merges of --debug use it.
+
+@njit('UniTuple(int64, 3)(int64[::1], int64, int64)', cache=True, nogil=True)
+def _mergeBounds(bounds, step, k):
+    numRuns = len(bounds) - 1
+    lo = bounds[2 * k * step]
+    mid = bounds[(2 * k + 1) * step]
+    hi = bounds[min((2 * k + 2) * step, numRuns)]
+    return lo, mid, hi
+
+
+@njit('void(int32[::1], int32[::1], float64[::1], float64[::1], int32[::1], int64[::1])',
+      cache=True, parallel=True)
+def _runHulls(ccw, cw, xs, ys, stepped, bounds):
+    for k in prange(len(bounds) - 1):
+        lo = bounds[k]
+        hi = bounds[k + 1]
+        _runHull(ccw, cw, xs, ys, stepped[2 * lo:2 * hi], lo, hi)
+
+
+@njit('void(int32[::1], int32[::1], float64[::1], float64[::1], int32[::1], int64[::1], int64)',
+      cache=True, parallel=True)
+def _mergePass(ccw, cw, xs, ys, stepped, bounds, step):
+    numRuns = len(bounds) - 1
+    numHulls = (numRuns + step - 1) // step
+
+    for k in prange(numHulls // 2):
+        lo, mid, hi = _mergeBounds(bounds, step, k)
+        _merge(ccw, cw, xs, ys, stepped[2 * lo:2 * hi], mid)
+
+
 # Build a convex hull from a set of point
 #
 # Use the method described in class
 #
-# Using the Divide & Conquer method
+# Using the Divide & Conquer method, bottom up: the sorted points are
+# cut into runs of about smallRunSize to 2*smallRunSize-1 points (or
+# one run, if there are fewer points), the hull of each run is built
+# directly by _runHull(), then neighbouring hulls are merged pairwise
+# until a single hull remains.  The hulls are index ranges into the sorted
+# points, given by the run bounds and the number of runs per hull.
+#
+# The hulls of a pass are independent, so the run hulls are always
+# built on all cores.  The merges of each pass are also spread over all
+# cores, except with --debug, where they are done one at a time so
+# that each can be shown.
+
 
+def buildHull():
+    n = len(xs)
 
-def buildHull(points: list[Point]):
-    # Handle base cases of two or three points
+    # Handle a single point, which is not on any hull, and points that
+    # are all on one line, whose hull is just the two end points
 
-    if len(points) == 2:
-        points[0].ccwPoint = points[1]
-        points[0].cwPoint = points[1]
-        points[1].ccwPoint = points[0]
-        points[1].cwPoint = points[0]
+    if n < 2:
         return
-    if len(points) == 3:
-        if turn(points[0], points[1], points[2]) == LEFT_TURN:
-            points[0].ccwPoint = points[1]
-            points[0].cwPoint = points[1]
-            points[1].ccwPoint = points[0]
-            points[1].cwPoint = points[0]
-        else:
-            points[0].ccwPoint = points[1]
-            points[0].cwPoint = points[2]
-            points[1].ccwPoint = points[2]
-            points[1].cwPoint = points[0]
-            points[2].ccwPoint = points[0]
-            points[2].cwPoint = points[1]
+
+    if np.all(turn(0, n - 1, np.arange(n)) == COLLINEAR):
+        ccw[0] = n - 1
+        cw[0] = n - 1
+        ccw[n - 1] = 0
+        cw[n - 1] = 0
         return
 
-    split = len(points) // 2
-    left = points[:split]
-    right = points[split:]
+    # Handle base cases of runs of up to 2*smallRunSize-1 points
+
+    stepped = np.empty(2 * n, dtype=np.int32)  # scratch space for _runHull() and _merge()
+
+    numRuns = max(1, n // smallRunSize)
+    bounds = np.arange(numRuns + 1, dtype=np.int64) * n // numRuns
+
+    # _merge() needs xs[mid-1] < xs[mid], so move each run start back
+    # to the first point with its x, and drop runs that become empty.
+    # Runs can then be smaller or larger than usual, down to one point.
+
+    bounds = np.searchsorted(xs, xs[bounds[:-1]], side='left')
+    bounds = np.append(np.unique(bounds), n)
+    numRuns = len(bounds) - 1
+
+    _runHulls(ccw, cw, xs, ys, stepped, bounds)
 
     # Handle recursive case.
     #
     # After you get the hull-merge working, do the following: For each
     # point that was removed from the convex hull in a merge, set that
-    # point's CCW and CW pointers to None.  You'll see that the arrows
+    # point's CCW and CW indices to -1.  You'll see that the arrows
     # from interior points disappear after you do this.
 
-    buildHull(left)
-    buildHull(right)
-
-    # Merge the individual hulls.
-    # Keep track of points stepped over during walk up/down.
-    previous_points: set[Point] = set()
-
-    # Walk up
-    left_node: Point = left[-1]
-    right_node: Point = right[0]
+    step = 1  # runs per hull in this pass
 
+    while step < numRuns:
 
+        # Merge the individual hulls.
+        #
+        # With --debug, merge them one at a time and do the following to
+        # help in debugging.  This highlights all the points, then shows
+        # them, then pauses until you press 'p'.  While paused, you can
+        # click on a point and its coordinates will be printed in the
+        # console window.  If you are using an IDE in which you can
+        # inspect your variables, this will help you to identify which
+        # point on the screen is which point in your data structure.
+        #
+        # This is good to do, for example, after you have built two
+        # hulls, to see that the two hulls look right.
+        #
+        # This can also be done immediately after you have merged to hulls
+        # ... again, to see that the merged hull looks right.
+        #
+        # Always after you have inspected things, you should remove the
+        # highlighting from the points that you previously highlighted.
+        #
+        # Without --debug, nothing is drawn until the hull is done.
 
-    # If the left or right point can step up
-    while (
-            turn(left_node.ccwPoint, left_node, right_node) == LEFT_TURN
-            or turn(left_node, right_node, right_node.cwPoint) == LEFT_TURN
-    ):
-        # Step up
-        if turn(left_node.ccwPoint, left_node, right_node) == LEFT_TURN:
-            previous_points.add(left_node)
-            assert left_node.ccwPoint is not None
-            left_node = left_node.ccwPoint
-        else:
-            previous_points.add(right_node)
-            assert right_node.cwPoint is not None
-            right_node = right_node.cwPoint
-
-    # Save references to points for top segment, to prevent modifying original
-    # `l` and `r` points before walk down algorithm occurs.
-    topleft = left_node
-    topright = right_node
-
-    # Walk down
-    left_node = left[-1]
-    right_node = right[0]
-
-    # If the left or right point can step down
-    while (
-            turn(left_node.cwPoint, left_node, right_node) == RIGHT_TURN
-            or turn(left_node, right_node, right_node.ccwPoint) == RIGHT_TURN
-    ):
-        # Step up
-        if turn(left_node.cwPoint, left_node, right_node) == RIGHT_TURN:
-            previous_points.add(left_node)
-            assert left_node.cwPoint is not None
-            left_node = left_node.cwPoint
-        else:
-            previous_points.add(right_node)
-            assert right_node.ccwPoint is not None
-            right_node = right_node.ccwPoint
+        if debugMode:
+            numHulls = (numRuns + step - 1) // step
 
-    bottom_right = right_node
-    bottom_left = left_node
+            for k in range(numHulls // 2):
+                lo, mid, hi = _mergeBounds(bounds, step, k)
 
-    topleft.cwPoint = topright
-    topright.ccwPoint = topleft
-    bottom_left.ccwPoint = bottom_right
-    bottom_right.cwPoint = bottom_left
+                _merge(ccw, cw, xs, ys, stepped, mid)
 
-    previous_points -= {topright, topleft, bottom_right, bottom_left}
+                highlight[lo:hi] = True
+                display(wait=True)
 
-    for point in previous_points:
-        point.cwPoint = None
-        point.ccwPoint = None
+                # At the very end of each merge, display the result, as
+                # shown below.  This call to display() does not pause.
 
-    # You can do the following to help in debugging.  This highlights
-    # all the points, then shows them, then pauses until you press
-    # 'p'.  While paused, you can click on a point and its coordinates
-    # will be printed in the console window.  If you are using an IDE
-    # in which you can inspect your variables, this will help you to
-    # identify which point on the screen is which point in your data
-    # structure.
-    #
-    # This is good to do, for example, after you have recursively
-    # built two hulls, to see that the two hulls look right.
-    #
-    # This can also be done immediately after you have merged to hulls
-    # ... again, to see that the merged hull looks right.
-    #
-    # Always after you have inspected things, you should remove the
-    # highlighting from the points that you previously highlighted.
+                display()
 
-    for p in points:
-        p.highlight = True
-    display(wait=True)
+        else:
+            _mergePass(ccw, cw, xs, ys, stepped, bounds, step)
 
-    # At the very end of buildHull(), you should display the result
-    # after every merge, as shown below.  This call to display() does
-    # not pause.
+        # With an odd number of hulls, the last one waits for the next pass
 
-    display()
+        step *= 2
 
 
 windowLeft = None
@@ -295,16 +529,20 @@ windowRight = None
 windowTop = None
 windowBottom = None
 
+needsRedraw = False  # set when the window or the points need drawing again
+
 
 # Set up the display and draw the current image
 
 def display(wait=False):
-    global lastKey, windowLeft, windowRight, windowBottom, windowTop
+    global lastKey, windowLeft, windowRight, windowBottom, windowTop, needsRedraw
 
     # Handle any events that have occurred
 
     glfw.poll_events()
 
+    needsRedraw = False
+
     # Set up window
 
     glClearColor(1, 1, 1, 0)
@@ -326,8 +564,7 @@ def display(wait=False):
 
     # Draw points and hull
 
-    for p in allPoints:
-        p.drawPoint()
+    drawPoints()
 
     # Show window
 
@@ -345,7 +582,8 @@ def display(wait=False):
             glfw.wait_events()
             if glfw.window_should_close(window):
                 sys.exit(0)
-            display()
+            if needsRedraw:  # skip key presses and other events that change nothing
+                display()
 
         sys.stderr.write('\r                     \r')
         sys.stderr.flush()
@@ -368,15 +606,27 @@ def keyCallback(window, key, scancode, action, mods):
 
 
 def windowReshapeCallback(window, newWidth, newHeight):
-    global windowWidth, windowHeight
+    global windowWidth, windowHeight, needsRedraw
 
     windowWidth = newWidth
     windowHeight = newHeight
 
+    needsRedraw = True
+
+
+# Handle window contents being damaged, e.g. after being uncovered
+
+def windowRefreshCallback(window):
+    global needsRedraw
+
+    needsRedraw = True
+
 
 # Handle mouse click/release
 
 def mouseButtonCallback(window, btn, action, keyModifiers):
+    global needsRedraw
+
     if action == glfw.PRESS:
 
         # Find point under mouse
@@ -386,25 +636,31 @@ def mouseButtonCallback(window, btn, action, keyModifiers):
         wx = (x - 0) / float(windowWidth) * (windowRight - windowLeft) + windowLeft
         wy = (windowHeight - y) / float(windowHeight) * (windowTop - windowBottom) + windowBottom
 
-        minDist = windowRight - windowLeft
-        minPoint = None
-        for p in allPoints:
-            dist = math.sqrt((p.x - wx) * (p.x - wx) + (p.y - wy) * (p.y - wy))
-            if dist < r and dist < minDist:
-                minDist = dist
-                minPoint = p
+        # The points are sorted by x, so only the points within r of the
+        # mouse in x can be under it
+
+        lo = np.searchsorted(xs, wx - r, side='left')
+        hi = np.searchsorted(xs, wx + r, side='right')
+
+        if hi == lo:
+            return
+
+        dists2 = (xs[lo:hi] - wx) * (xs[lo:hi] - wx) + (ys[lo:hi] - wy) * (ys[lo:hi] - wy)  # squared, to skip sqrt
+        nearest = np.argmin(dists2)
+        minPoint = lo + nearest
 
         # print point and toggle its highlight
 
-        if minPoint:
-            minPoint.highlight = not minPoint.highlight
-            print(minPoint)
+        if dists2[nearest] < r * r:
+            highlight[minPoint] = not highlight[minPoint]
+            needsRedraw = True
+            print('pt(%g,%g)' % (xs[minPoint], ys[minPoint]))
 
 
 # Initialize GLFW and run the main event loop
 
 def main():
-    global window, allPoints, minX, maxX, minY, maxY, r, discardPoints
+    global window, xs, ys, ccw, cw, highlight, minX, maxX, minY, maxY, r, discardPoints, debugMode
 
     # Check command-line args
 
@@ -417,6 +673,8 @@ def main():
         print(args)
         if args[0] == '-d':
             discardPoints = not discardPoints
+        elif args[0] == '--debug':
+            debugMode = True
         args = args[1:]
 
     # Set up window
@@ -436,39 +694,72 @@ def main():
     glfw.swap_interval(1)
     glfw.set_key_callback(window, keyCallback)
     glfw.set_window_size_callback(window, windowReshapeCallback)
+    glfw.set_window_refresh_callback(window, windowRefreshCallback)
     glfw.set_mouse_button_callback(window, mouseButtonCallback)
 
     # Read the points
 
-    with open(args[0], 'rb') as f:
-        allPoints = [Point(line.split(b' ')) for line in f.readlines()]
+    coords = np.loadtxt(args[0], dtype=np.float64, ndmin=2)
+
+    if len(coords) == 0:
+        print('Error: %s contains no points' % args[0])
+        sys.exit(1)
+
+    # Sort by increasing x.  For equal x, sort by increasing y.  This
+    # also removes duplicate points.
+
+    coords = np.unique(coords, axis=0)
+
+    # Store the points
+
+    n = len(coords)
+
+    xs = np.ascontiguousarray(coords[:, 0])
+    ys = np.ascontiguousarray(coords[:, 1])
 
-    # Get bounding box of points
+    # Get bounding box of points.  The points are sorted by x, so only
+    # y needs a scan.
 
-    minX = min(p.x for p in allPoints)
-    maxX = max(p.x for p in allPoints)
-    minY = min(p.y for p in allPoints)
-    maxY = max(p.y for p in allPoints)
+    minX = xs[0]
+    maxX = xs[-1]
+    minY = ys.min()
+    maxY = ys.max()
+
+    # If all points have the same x or y, widen that side of the box so
+    # that the window still has an area
+
+    size = max(maxX - minX, maxY - minY) or 1.0
+
+    if maxX == minX:
+        minX -= size / 2
+        maxX += size / 2
+    if maxY == minY:
+        minY -= size / 2
+        maxY += size / 2
 
     # Adjust point radius in proportion to bounding box
 
-    if maxX - minX > maxY - minY:
-        r *= maxX - minX
-    else:
-        r *= maxY - minY
+    r *= max(maxX - minX, maxY - minY)
 
-    # Sort by increasing x.  For equal x, sort by increasing y.
+    ccw = np.full(n, -1, dtype=np.int32)
+    cw = np.full(n, -1, dtype=np.int32)
 
-    allPoints.sort(key=lambda p: (p.x, p.y))
+    highlight = np.zeros(n, dtype=np.bool_)
+
+    buildCircles()
 
     # Run the code
 
-    buildHull(allPoints)
+    buildHull()
+
+    # Show the hull and wait to exit
 
-    # Wait to exit
+    display()
 
     while not glfw.window_should_close(window):
         glfw.wait_events()
+        if needsRedraw:
+            display()
 
     glfw.destroy_window(window)
     glfw.terminate()